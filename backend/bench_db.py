@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLite read/write concurrency with and without the db.py pragmas.
+Run from backend/: python bench_db.py [--seconds 5] [--readers 4]
+
+Compares the old setup (rollback journal, synchronous=FULL, no busy_timeout)
+against SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap_size, busy_timeout)
+using one writer inserting commands and several readers listing them.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from sqlmodel import SQLModel, Session, select
+from sqlalchemy.exc import OperationalError
+from models import User, Command
+from db import create_db_engine, SQLITE_PRAGMAS
+
+BASELINE_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def run(pragmas: dict, seconds: float, readers: int):
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    engine = create_db_engine(path, sqlite_pragmas=pragmas)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(name="bench", api_key="bench")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    stop = threading.Event()
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def bump(key):
+        with lock:
+            counts[key] += 1
+
+    def writer():
+        while not stop.is_set():
+            try:
+                with Session(engine) as session:
+                    session.add(Command(user_id=user_id, command_text="echo bench"))
+                    session.commit()
+                bump("writes")
+            except OperationalError:
+                bump("errors")
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with Session(engine) as session:
+                    session.exec(select(Command).where(Command.user_id == user_id)
+                                 .order_by(Command.created_at.desc()).limit(50)).all()
+                bump("reads")
+            except OperationalError:
+                bump("errors")
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return {"writes": counts["writes"] / seconds, "reads": counts["reads"] / seconds,
+            "errors": counts["errors"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    for label, pragmas in (("rollback journal", BASELINE_PRAGMAS), ("WAL + tuned", SQLITE_PRAGMAS)):
+        res = run(pragmas, args.seconds, args.readers)
+        print(f"{label:>16}: {res['writes']:8.1f} writes/s  {res['reads']:8.1f} reads/s  {res['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
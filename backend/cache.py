@@ -0,0 +1,89 @@
+# cache.py
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from sqlmodel import Session
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from db import engine
+from models import ResourceVersion
+
+
+def get_version(session: Session, name: str):
+    """Return the stored ResourceVersion for name, or an unsaved version-0 row."""
+    row = session.get(ResourceVersion, name)
+    if row is None:
+        row = ResourceVersion(name=name, version=0, updated_at=datetime(1970, 1, 1))
+    return row
+
+
+def ensure_version(name: str):
+    """Create name's version row if missing; safe when instances start together."""
+    with Session(engine) as session:
+        if session.get(ResourceVersion, name) is not None:
+            return
+        session.add(ResourceVersion(name=name, version=0, updated_at=datetime.utcnow()))
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another instance created it first
+            session.rollback()
+
+
+def bump_version(session: Session, name: str):
+    """Increment name's version in the caller's transaction (caller commits).
+
+    Uses an in-place UPDATE so concurrent writers on other instances don't
+    lose increments. The backend creates the row at startup (ensure_version);
+    the INSERT fallback only covers scripts run against a fresh database.
+    """
+    now = datetime.utcnow()
+    res = session.exec(update(ResourceVersion).where(ResourceVersion.name == name)
+                       .values(version=ResourceVersion.version + 1, updated_at=now))
+    if res.rowcount == 0:
+        session.add(ResourceVersion(name=name, version=1, updated_at=now))
+
+
+class VersionedResource:
+    """Serialized response for a slow-changing resource, cached per DB version.
+
+    The version lives in the ResourceVersion table, so a write on any backend
+    instance invalidates every instance's cache on its next request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._body = None
+        self._body_version = None
+        self._lock = threading.Lock()
+
+    def etag(self, row: ResourceVersion):
+        # updated_at distinguishes versions if the table is ever reset
+        return f'"{self.name}-{row.version}-{int(row.updated_at.replace(tzinfo=timezone.utc).timestamp())}"'
+
+    def last_modified_header(self, row: ResourceVersion):
+        return format_datetime(row.updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+
+    def get_body(self, version: int, loader):
+        """Return the cached body for version, calling loader() on a miss."""
+        with self._lock:
+            if self._body_version == version:
+                return self._body
+        body = loader()
+        with self._lock:
+            self._body = body
+            self._body_version = version
+        return body
+
+
+def etag_matches(if_none_match, etag: str):
+    """True if an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return any(t.removeprefix("W/") == etag for t in candidates)
+
+
+rules_resource = VersionedResource("rules")
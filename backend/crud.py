@@ -1,10 +1,12 @@
 # crud.py
-from sqlmodel import select
+from sqlmodel import select, func
 from models import User, Rule, Command, Approval, ApprovalVote, EventLog
 from db import get_session
+from executor import EXECUTOR_MODE
+from cache import bump_version
 from sqlmodel import Session
 from datetime import datetime, timedelta
-import re, json
+import re, json, shlex
 
 def get_user_by_api_key(session: Session, api_key: str):
     return session.exec(select(User).where(User.api_key == api_key)).first()
@@ -32,6 +34,7 @@ def add_rule(session: Session, pattern: str, action: str, priority: int = 100, *
                 active_hours_end=kwargs.get("active_hours_end"),
                 created_by=kwargs.get("created_by"))
     session.add(rule)
+    bump_version(session, "rules")
     session.commit()
     session.refresh(rule)
     # do conflict detection (simple)
@@ -45,6 +48,20 @@ def add_rule(session: Session, pattern: str, action: str, priority: int = 100, *
             pass
     return rule, conflicts
 
+# Commands run without a shell (executor.SubprocessRunner), but anything the
+# shell would interpret is never auto-accepted
+SHELL_METACHARACTERS = set(";&|$`<>(){}[]*?~!#'\"\\\n")
+
+def has_shell_metacharacters(command_text: str):
+    return any(ch in SHELL_METACHARACTERS for ch in command_text)
+
+def split_command(command_text: str):
+    """Split command text into argv, raising ValueError if it can't be parsed."""
+    argv = shlex.split(command_text)
+    if not argv:
+        raise ValueError("Empty command")
+    return argv
+
 def match_rule(session: Session, command_text: str, nowtime, user = None):
     """Match command against rules in priority order.
     
@@ -55,13 +72,15 @@ def match_rule(session: Session, command_text: str, nowtime, user = None):
         user: Current user (optional, for seniority overrides)
     
     Returns:
-        (rule, action) tuple where action may be overridden by seniority or time
+        (rule, action, threshold) tuple where action and threshold may be
+        overridden by seniority or time. The Rule row itself is never modified.
     """
     rules = list_rules(session)
     for r in rules:
         try:
             if re.search(r.pattern, command_text):
                 action = r.action
+                threshold = r.threshold
                 
                 # Time-based override: outside active hours -> REQUIRE_APPROVAL
                 if r.active_hours_start and r.active_hours_end:
@@ -80,16 +99,25 @@ def match_rule(session: Session, command_text: str, nowtime, user = None):
                             # Override can specify: action, threshold, or both
                             if "action" in override:
                                 action = override["action"]
-                            # Store adjusted threshold on rule object (temp)
                             if "threshold" in override:
-                                r.threshold = override["threshold"]
+                                threshold = override["threshold"]
                     except json.JSONDecodeError:
                         pass
                 
-                return r, action
+                # Chained/substituted/quoted commands always need a human
+                if action == "AUTO_ACCEPT" and has_shell_metacharacters(command_text):
+                    action = "REQUIRE_APPROVAL"
+                
+                # When commands really run, an AUTO_ACCEPT pattern must cover the
+                # whole command, not just a substring or prefix of it
+                if (action == "AUTO_ACCEPT" and EXECUTOR_MODE == "subprocess"
+                        and not re.fullmatch(r.pattern, command_text)):
+                    action = "REQUIRE_APPROVAL"
+                
+                return r, action, threshold
         except Exception:
             continue
-    return None, None
+    return None, None, None
 
 def create_command(session: Session, user: User, command_text: str):
     cmd = Command(user_id=user.id, command_text=command_text)
@@ -99,3 +127,23 @@ def create_command(session: Session, user: User, command_text: str):
     session.add(EventLog(event_type="COMMAND_SUBMITTED", user_id=user.id, details=command_text))
     session.commit()
     return cmd
+
+def dashboard_summary(session: Session, user: User, limit: int = 20):
+    """Latest commands, per-status totals and pending approval count for the Dashboard.
+
+    Members get their own commands and approval requests. Admins get every
+    user's commands and totals; admins and approvers get every pending
+    approval. Totals are computed with aggregate queries rather than loading rows.
+    """
+    cmd_q = select(Command)
+    status_q = select(Command.status, func.count(Command.id)).group_by(Command.status)
+    pending_q = select(func.count(Approval.id)).where(Approval.resolved == False)
+    if user.role != "admin":
+        cmd_q = cmd_q.where(Command.user_id == user.id)
+        status_q = status_q.where(Command.user_id == user.id)
+    if user.role not in ("admin", "approver"):
+        pending_q = pending_q.where(Approval.requested_by == user.id)
+    commands = session.exec(cmd_q.order_by(Command.created_at.desc()).limit(limit)).all()
+    status_totals = {status: count for status, count in session.exec(status_q).all()}
+    pending_approvals = session.exec(pending_q).one()
+    return commands, status_totals, pending_approvals
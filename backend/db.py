@@ -1,24 +1,102 @@
 # db.py
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
 import os
 
 # Support both SQLite (local dev, Render) and PostgreSQL (Railway)
 DB_URL = os.environ.get("DATABASE_URL")
+# Optional read replica; read-only endpoints use it when set
+DB_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+
+# Pool tuning (applies to PostgreSQL and file-based SQLite)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "30"))    # seconds
+
+# SQLite per-connection pragmas
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def normalize_url(url: str = None):
+    """Turn DATABASE_URL into a SQLAlchemy URL.
+
+    Bare file paths (e.g. ./db.sqlite, /data/db.sqlite) are treated as SQLite,
+    and postgresql:// is pinned to the psycopg2 driver.
+    """
+    if not url:
+        # Default to local SQLite for development
+        return "sqlite:///./db.sqlite"
+    if "://" not in url:
+        return f"sqlite:///{url}"
+    if url.startswith("postgresql://"):
+        # Railway: convert postgresql:// to postgresql+psycopg2://
+        return url.replace("postgresql://", "postgresql+psycopg2://", 1)
+    return url
+
+
+def _is_sqlite_memory(url: str):
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+SQLITE_PRAGMAS = {
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+}
+
+
+def _sqlite_pragma_listener(pragmas: dict):
+    def set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return set_pragmas
+
+
+def create_db_engine(url: str = None, sqlite_pragmas: dict = None, **overrides):
+    """Shared engine factory used by the backend, worker and scripts.
+
+    Pool settings come from DB_POOL_* env vars; keyword arguments override them.
+    SQLite connections get SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap_size,
+    busy_timeout) applied on connect, or `sqlite_pragmas` if given.
+    """
+    url = normalize_url(url)
+    if url.startswith("sqlite"):
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if not _is_sqlite_memory(url):
+            # In-memory databases keep SQLAlchemy's single-connection pool
+            kwargs.update(poolclass=QueuePool, pool_size=DB_POOL_SIZE,
+                          max_overflow=DB_MAX_OVERFLOW, pool_recycle=DB_POOL_RECYCLE,
+                          pool_timeout=DB_POOL_TIMEOUT)
+        kwargs.update(overrides)
+        eng = create_engine(url, **kwargs)
+        event.listen(eng, "connect", _sqlite_pragma_listener(
+            SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas))
+        return eng
+    kwargs = {"echo": False, "pool_pre_ping": True, "pool_size": DB_POOL_SIZE,
+              "max_overflow": DB_MAX_OVERFLOW, "pool_recycle": DB_POOL_RECYCLE,
+              "pool_timeout": DB_POOL_TIMEOUT}
+    kwargs.update(overrides)
+    return create_engine(url, **kwargs)
+
+
+engine = create_db_engine(DB_URL)
+# Reads fall back to the primary when no replica is configured
+read_engine = create_db_engine(DB_REPLICA_URL) if DB_REPLICA_URL else engine
+
+
+def get_engine():
+    return engine
 
-if not DB_URL:
-    # Default to local SQLite for development
-    DB_PATH = "./db.sqlite"
-    engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
-elif DB_URL.startswith("sqlite"):
-    # Render with persistent disk
-    engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
-elif DB_URL.startswith("postgresql"):
-    # Railway: convert postgresql:// to postgresql+psycopg2:// if needed
-    db_url = DB_URL.replace("postgresql://", "postgresql+psycopg2://") if "psycopg2" not in DB_URL else DB_URL
-    engine = create_engine(db_url, echo=False, pool_pre_ping=True)
-else:
-    # Fallback to URL as-is
-    engine = create_engine(DB_URL, echo=False, pool_pre_ping=True)
 
 def init_db():
     SQLModel.metadata.create_all(engine)
@@ -26,3 +104,8 @@ def init_db():
 def get_session():
     with Session(engine) as session:
         yield session
+
+def get_read_session():
+    """Session for read-only endpoints; routed to DATABASE_REPLICA_URL if set."""
+    with Session(read_engine) as session:
+        yield session
@@ -0,0 +1,307 @@
+# executor.py
+# Background command execution with bounded concurrency.
+#
+# Handlers commit the command as QUEUED and call command_executor.submit(id);
+# a worker thread then runs it and writes output to Command.result in chunks.
+#
+# EXECUTOR_MODE=dry-run (default) records what would run without running it
+# EXECUTOR_MODE=subprocess runs shlex.split(command_text) directly, without a shell
+import os, shlex, signal, subprocess, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlmodel import Session, select
+from sqlalchemy import update
+from db import engine
+from models import Command, EventLog
+
+EXECUTOR_MODE = os.environ.get("EXECUTOR_MODE", "dry-run").lower()
+EXECUTOR_WORKERS = int(os.environ.get("EXECUTOR_WORKERS", "4"))
+EXECUTOR_TIMEOUT = float(os.environ.get("EXECUTOR_TIMEOUT", "30"))              # seconds
+EXECUTOR_MAX_OUTPUT = int(os.environ.get("EXECUTOR_MAX_OUTPUT", str(64 * 1024)))  # bytes kept
+EXECUTOR_FLUSH_BYTES = int(os.environ.get("EXECUTOR_FLUSH_BYTES", "4096"))        # write every N bytes
+EXECUTOR_FLUSH_INTERVAL = float(os.environ.get("EXECUTOR_FLUSH_INTERVAL", "1"))   # ...or every N seconds
+
+TRUNCATED_MARKER = "\n[output truncated]"
+
+
+class ExecutionResult:
+    def __init__(self, exit_code: int = 0, timed_out: bool = False):
+        self.exit_code = exit_code
+        self.timed_out = timed_out
+
+
+class DryRunRunner:
+    """Runs nothing; reports what would have been executed."""
+
+    def run(self, command_text: str, on_output):
+        on_output(f"[DRY RUN] Would run: {command_text}".encode())
+        return ExecutionResult()
+
+
+class SubprocessRunner:
+    """Runs shlex.split(command_text) without a shell, streaming stdout+stderr
+    to on_output. Pipes, `;`, `$(...)` etc. reach the program as literal args.
+
+    The process (and its process group on POSIX) is killed after `timeout` seconds.
+    """
+
+    def __init__(self, timeout: float = EXECUTOR_TIMEOUT):
+        self.timeout = timeout
+
+    def run(self, command_text: str, on_output):
+        posix = os.name == "posix"
+        proc = subprocess.Popen(shlex.split(command_text), shell=False, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                start_new_session=posix)
+        timed_out = threading.Event()
+
+        def kill():
+            # The process may have exited just as the timer fired
+            if proc.poll() is not None:
+                return
+            timed_out.set()
+            try:
+                if posix:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+
+        timer = threading.Timer(self.timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            fd = proc.stdout.fileno()
+            while True:
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    break
+                on_output(chunk)
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        return ExecutionResult(exit_code=proc.returncode, timed_out=timed_out.is_set())
+
+
+RUNNERS = {
+    "dry-run": DryRunRunner,
+    "subprocess": SubprocessRunner,
+}
+
+
+class OutputBuffer:
+    """Collects output up to max_bytes and flushes it to Command.result in chunks.
+
+    Flushes happen every flush_bytes of output, and between start() and stop()
+    a background thread also flushes every flush_interval seconds, so output
+    shows up even while the command is quiet.
+    """
+
+    def __init__(self, command_id: int, max_bytes: int = EXECUTOR_MAX_OUTPUT,
+                 flush_bytes: int = EXECUTOR_FLUSH_BYTES, flush_interval: float = EXECUTOR_FLUSH_INTERVAL):
+        self.command_id = command_id
+        self.max_bytes = max_bytes
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.data = bytearray()
+        self.truncated = False
+        self.notes = []
+        self._unflushed = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def start(self):
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            if self._unflushed:
+                self.flush()
+
+    def write(self, chunk: bytes):
+        with self._lock:
+            room = self.max_bytes - len(self.data)
+            if room <= 0:
+                # Keep draining the pipe so the process doesn't block, but drop the bytes
+                self.truncated = True
+                return
+            if len(chunk) > room:
+                chunk = chunk[:room]
+                self.truncated = True
+            self.data.extend(chunk)
+            self._unflushed += len(chunk)
+            due = self._unflushed >= self.flush_bytes
+        if due:
+            self.flush()
+
+    def note(self, text: str):
+        """Append executor text (e.g. errors) after the output, outside the cap."""
+        self.notes.append(text)
+
+    def text(self):
+        text = self.data.decode("utf-8", errors="replace")
+        if self.truncated:
+            text += TRUNCATED_MARKER
+        return text + "".join(self.notes)
+
+    def flush(self):
+        with self._lock:
+            text = self.text()
+            self._unflushed = 0
+        with Session(engine) as session:
+            # Only while RUNNING, so a row recovery has already failed isn't overwritten
+            session.exec(update(Command)
+                         .where(Command.id == self.command_id, Command.status == "RUNNING")
+                         .values(result=text))
+            session.commit()
+
+
+class CommandExecutor:
+    """Bounded pool of worker threads, each running one command at a time.
+
+    Status moves QUEUED -> RUNNING -> EXECUTED | FAILED | TIMEOUT.
+    """
+
+    def __init__(self, runner, workers: int = EXECUTOR_WORKERS):
+        self.runner = runner
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command-executor")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._not_found = 0
+        self._runtime_total = 0.0
+        self._runtime_max = 0.0
+
+    def submit(self, command_id: int):
+        """Queue a committed command for execution; returns immediately."""
+        with self._lock:
+            self._queued += 1
+        return self._pool.submit(self._execute, command_id)
+
+    def metrics(self):
+        with self._lock:
+            finished = self._completed + self._failed + self._timed_out
+            return {
+                "mode": EXECUTOR_MODE,
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "not_found": self._not_found,
+                "runtime_avg_seconds": self._runtime_total / finished if finished else 0.0,
+                "runtime_max_seconds": self._runtime_max,
+            }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def recover(self):
+        """Re-queue QUEUED commands and fail stale RUNNING ones; call once at startup.
+
+        Assumes no other live process is executing against the same DB, since a
+        RUNNING row can't be told apart from one orphaned by a crash.
+        """
+        with Session(engine) as session:
+            queued = session.exec(select(Command.id).where(Command.status == "QUEUED")
+                                  .order_by(Command.created_at)).all()
+            stale = session.exec(select(Command).where(Command.status == "RUNNING")).all()
+            for cmd in stale:
+                cmd.status = "FAILED"
+                cmd.result = (cmd.result or "") + "\n[executor restarted while running]"
+                cmd.executed_at = datetime.utcnow()
+                session.add(cmd)
+                session.add(EventLog(event_type="COMMAND_FAILED", user_id=cmd.user_id,
+                                     details=f"{cmd.id}: executor restarted while running"))
+            session.commit()
+        for command_id in queued:
+            self.submit(command_id)
+        return len(queued), len(stale)
+
+    def _execute(self, command_id: int):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        started = time.monotonic()
+        status = "FAILED"
+        try:
+            with Session(engine) as session:
+                cmd = session.get(Command, command_id)
+                if not cmd:
+                    status = "NOT_FOUND"
+                    return
+                command_text, user_id = cmd.command_text, cmd.user_id
+                # Claim the row so a re-queue after restart can't run it twice
+                claimed = session.exec(update(Command)
+                                       .where(Command.id == command_id, Command.status == "QUEUED")
+                                       .values(status="RUNNING"))
+                session.commit()
+                if claimed.rowcount == 0:
+                    status = "NOT_FOUND"
+                    return
+
+            output = OutputBuffer(command_id)
+            output.start()
+            try:
+                res = self.runner.run(command_text, output.write)
+                if res.timed_out:
+                    status = "TIMEOUT"
+                elif res.exit_code == 0:
+                    status = "EXECUTED"
+            except Exception as e:
+                output.note(f"\n[executor error] {e}")
+            finally:
+                output.stop()
+
+            with Session(engine) as session:
+                # Conditional so a row another instance's recover() already
+                # marked FAILED (or deleted) keeps that outcome and one event
+                saved = session.exec(update(Command)
+                                     .where(Command.id == command_id, Command.status == "RUNNING")
+                                     .values(status=status, result=output.text(),
+                                             executed_at=datetime.utcnow()))
+                if saved.rowcount == 0:
+                    session.rollback()
+                    print(f"WARNING: command {command_id} is no longer RUNNING; result not saved")
+                    status = "NOT_FOUND"
+                    return
+                session.add(EventLog(event_type=f"COMMAND_{status}", user_id=user_id, details=command_text))
+                session.commit()
+        except Exception as e:
+            print(f"ERROR executing command {command_id}: {e}")
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._running -= 1
+                if status != "NOT_FOUND":
+                    self._runtime_total += elapsed
+                    self._runtime_max = max(self._runtime_max, elapsed)
+                if status == "NOT_FOUND":
+                    # Row deleted, claimed by another process, or failed by recover()
+                    self._not_found += 1
+                elif status == "EXECUTED":
+                    self._completed += 1
+                elif status == "TIMEOUT":
+                    self._timed_out += 1
+                else:
+                    self._failed += 1
+
+
+if EXECUTOR_MODE not in RUNNERS:
+    raise ValueError(f"Unknown EXECUTOR_MODE {EXECUTOR_MODE!r}; expected one of {sorted(RUNNERS)}")
+
+command_executor = CommandExecutor(RUNNERS[EXECUTOR_MODE]())
@@ -1,14 +1,17 @@
 # main.py
-import uvicorn, os, secrets, json, asyncio
-from fastapi import FastAPI, Depends, HTTPException, Header
+import uvicorn, os, secrets, json, hashlib
+from fastapi import FastAPI, Depends, HTTPException, Header, Response, Query, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from db import init_db, get_session
+from db import init_db, get_session, get_read_session
 from sqlmodel import Session
-from crud import get_user_by_api_key, create_user, add_rule, match_rule, create_command
+from crud import get_user_by_api_key, create_user, add_rule, match_rule, create_command, dashboard_summary, split_command
 from schemas import CreateUser, CreateRule, SubmitCommand
 from models import User, Rule, Command, Approval, ApprovalVote, EventLog
 from datetime import datetime, timedelta
 from notifications import send_email
+from cache import rules_resource, get_version, bump_version, ensure_version, etag_matches
+from executor import command_executor
 from typing import Optional
 from sqlmodel import select
 
@@ -26,6 +29,8 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup():
     init_db()
+    # Create the version row up front so concurrent first bumps can't both INSERT
+    ensure_version("rules")
     # create default admin if none exist
     with next(get_session()) as session:
         if not session.exec(select(User).where(User.role=="admin")).first():
@@ -39,14 +44,25 @@ def on_startup():
                 {"name": "Block fork bomb", "pattern": r":\(\)\{\ :\|:\&\ \}\;:", "action": "AUTO_REJECT", "priority": 1, "threshold": 2},
                 {"name": "Block rm -rf /", "pattern": r"rm\s+-rf\s+/", "action": "AUTO_REJECT", "priority": 2, "threshold": 2},
                 {"name": "Block mkfs commands", "pattern": r"mkfs\.", "action": "AUTO_REJECT", "priority": 3, "threshold": 2},
-                {"name": "Auto-accept git operations", "pattern": r"git\s+(status|log|diff)", "action": "AUTO_ACCEPT", "priority": 10, "threshold": 1},
-                {"name": "Auto-accept safe read commands", "pattern": r"^(ls|cat|pwd|echo)", "action": "AUTO_ACCEPT", "priority": 11, "threshold": 1},
+                {"name": "Auto-accept git operations", "pattern": r"^git\s+(status|log|diff)\b", "action": "AUTO_ACCEPT", "priority": 10, "threshold": 1},
+                {"name": "Auto-accept safe read commands", "pattern": r"^(ls|cat|pwd|echo)\b", "action": "AUTO_ACCEPT", "priority": 11, "threshold": 1},
             ]
             for rule_data in seed_rules_list:
                 rule = Rule(**rule_data)
                 session.add(rule)
+            bump_version(session, "rules")
             session.commit()
             print(f"✅ Seeded {len(seed_rules_list)} initial rules")
+    
+    # Pick up commands a previous process left behind (crash, redeploy, shutdown)
+    requeued, failed = command_executor.recover()
+    if requeued or failed:
+        print(f"Executor recovery: re-queued {requeued}, marked {failed} stale RUNNING as FAILED")
+
+@app.on_event("shutdown")
+def on_shutdown():
+    # Finish what's running; anything still QUEUED is re-queued on next startup
+    command_executor.shutdown(wait=True, cancel_futures=True)
 
 # dependency to get user from API key
 def get_current_user(x_api_key: Optional[str] = Header(None)):
@@ -68,33 +84,50 @@ def api_create_user(payload: CreateUser, admin: User = Depends(get_current_user)
         return {"api_key": u.api_key, "user_id": u.id}
 
 
+def cache_headers(etag: str, last_modified: Optional[str] = None):
+    # private: responses depend on the API key; no-cache: always revalidate
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+def profile_body(user: User):
+    return {
+        "id": user.id,
+        "username": user.name or "user",
+        "role": user.role,
+        "seniority": user.seniority,
+        "credits": user.credits
+    }
+
 @app.get("/users/me")
-def api_get_current_user(user: User = Depends(get_current_user)):
+def api_get_current_user(user: User = Depends(get_current_user), if_none_match: Optional[str] = Header(None)):
     """Return basic profile for the authenticated API key."""
-    # Refresh from DB to get latest credits
-    with next(get_session()) as session:
-        fresh_user = session.get(User, user.id)
-        if not fresh_user:
-            return {
-                "id": user.id,
-                "username": user.name or "user",
-                "role": user.role,
-                "seniority": user.seniority,
-                "credits": user.credits
-            }
-        return {
-            "id": fresh_user.id,
-            "username": fresh_user.name or "user",
-            "role": fresh_user.role,
-            "seniority": fresh_user.seniority,
-            "credits": fresh_user.credits
-        }
+    # get_current_user just loaded the user, so the body is fresh; hashing it
+    # means any profile or credit change yields a new ETag
+    body = json.dumps(profile_body(user), sort_keys=True)
+    etag = f'"profile-{hashlib.sha1(body.encode()).hexdigest()}"'
+    headers = cache_headers(etag)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.get("/rules")
-def api_list_rules(user: User = Depends(get_current_user)):
+def api_list_rules(user: User = Depends(get_current_user), if_none_match: Optional[str] = Header(None)):
+    # Primary, not replica: a lagging replica could pin stale rules to a new version
     with next(get_session()) as session:
-        rules = session.exec(select(Rule).order_by(Rule.priority)).all()
-        return rules
+        version = get_version(session, "rules")
+        etag = rules_resource.etag(version)
+        headers = cache_headers(etag, rules_resource.last_modified_header(version))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        def load_rules_body():
+            rules = session.exec(select(Rule).order_by(Rule.priority)).all()
+            return json.dumps(jsonable_encoder(rules)).encode()
+
+        body = rules_resource.get_body(version.version, load_rules_body)
+        return Response(content=body, media_type="application/json", headers=headers)
 
 @app.post("/rules")
 def api_create_rule(payload: CreateRule, admin: User = Depends(get_current_user)):
@@ -115,15 +148,19 @@ def api_create_rule(payload: CreateRule, admin: User = Depends(get_current_user)
             raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/commands")
-def api_submit_command(cmd: SubmitCommand, user: User = Depends(get_current_user)):
+def api_submit_command(cmd: SubmitCommand, background_tasks: BackgroundTasks, user: User = Depends(get_current_user)):
     with next(get_session()) as session:
         # ensure credits
         if user.credits <= 0:
             raise HTTPException(status_code=402, detail="No credits")
+        try:
+            split_command(cmd.command_text)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid command: {e}")
         # create record
         command = create_command(session, user, cmd.command_text)
         # match rule (pass user for seniority overrides)
-        r, action = match_rule(session, cmd.command_text, datetime.utcnow(), user)
+        r, action, rule_threshold = match_rule(session, cmd.command_text, datetime.utcnow(), user)
         if not r:
             # default to require approval for unknown
             action = "REQUIRE_APPROVAL"
@@ -136,23 +173,22 @@ def api_submit_command(cmd: SubmitCommand, user: User = Depends(get_current_user
             session.commit()
             return {"status": "rejected", "reason": "dangerous command"}
         elif action == "AUTO_ACCEPT":
-            # deduct credits and mock execute - all inside transaction
+            # deduct credits and queue - execution happens on the executor pool
             try:
                 user.credits -= 1
-                command.status = "EXECUTED"
-                command.result = f"[MOCK EXECUTION] Would run: {cmd.command_text}"
-                command.executed_at = datetime.utcnow()
+                command.status = "QUEUED"
                 command.rule_triggered = r.id if r else None
                 session.add(user); session.add(command)
-                session.add(EventLog(event_type="COMMAND_EXECUTED", user_id=user.id, details=cmd.command_text))
+                session.add(EventLog(event_type="COMMAND_QUEUED", user_id=user.id, details=cmd.command_text))
                 session.commit()
-                return {"status": "executed", "new_balance": user.credits, "result": command.result}
             except Exception as e:
                 session.rollback()
                 raise HTTPException(status_code=500, detail=str(e))
+            command_executor.submit(command.id)
+            return {"status": "queued", "command_id": command.id, "new_balance": user.credits}
         else:
             # REQUIRE_APPROVAL -> create approval record
-            threshold = r.threshold if r and r.threshold else 2
+            threshold = rule_threshold or 2
             expires_at = datetime.utcnow() + timedelta(minutes=10)
             approval = Approval(command_id=command.id, requested_by=user.id,
                                 threshold_required=threshold, expires_at=expires_at)
@@ -173,21 +209,34 @@ Votes required: {threshold}
 Expires at: {expires_at.strftime('%Y-%m-%d %H:%M UTC')}
 
 Please review and vote."""
-                asyncio.create_task(send_email(approver.name, subject, text))
+                background_tasks.add_task(send_email, approver.name, subject, text)
             
             return {"status": "pending_approval", "approval_id": approval.id}
 
 @app.get("/commands")
 def api_list_commands(user: User = Depends(get_current_user)):
-    with next(get_session()) as session:
+    with next(get_read_session()) as session:
         if user.role == "admin":
             results = session.exec(select(Command).order_by(Command.created_at.desc())).all()
         else:
             results = session.exec(select(Command).where(Command.user_id==user.id).order_by(Command.created_at.desc())).all()
         return results
 
+@app.get("/dashboard")
+def api_dashboard(limit: int = Query(20, ge=1, le=100), user: User = Depends(get_current_user)):
+    """Profile, latest commands, status totals and pending approvals in one round trip."""
+    # Primary, not replica: Dashboard.jsx refreshes this right after POST /commands
+    with next(get_session()) as session:
+        commands, status_totals, pending_approvals = dashboard_summary(session, user, limit)
+        return {
+            "profile": profile_body(user),
+            "commands": commands,
+            "status_totals": status_totals,
+            "pending_approvals": pending_approvals
+        }
+
 @app.post("/approvals/{approval_id}/vote")
-def api_vote(approval_id: int, vote: str, user: User = Depends(get_current_user)):
+def api_vote(approval_id: int, vote: str, background_tasks: BackgroundTasks, user: User = Depends(get_current_user)):
     if user.role not in ("admin", "approver"):
         raise HTTPException(status_code=403, detail="Not an approver")
     with next(get_session()) as session:
@@ -201,7 +250,7 @@ def api_vote(approval_id: int, vote: str, user: User = Depends(get_current_user)
         approves = len([v for v in votes if v.vote=="APPROVE"])
         rejects = len([v for v in votes if v.vote=="REJECT"])
         if approves >= appr.threshold_required:
-            # finalize: execute command
+            # finalize: queue command for execution
             cmd = session.get(Command, appr.command_id)
             u = session.get(User, cmd.user_id)
             if u.credits <= 0:
@@ -210,25 +259,24 @@ def api_vote(approval_id: int, vote: str, user: User = Depends(get_current_user)
                 session.commit()
                 return {"status":"failed","reason":"no credits"}
             u.credits -= 1
-            cmd.status = "EXECUTED"
-            cmd.result = f"[MOCK EXECUTION - APPROVED] by {user.name}"
-            cmd.executed_at = datetime.utcnow()
+            cmd.status = "QUEUED"
             appr.resolved = True
             session.add(u); session.add(cmd); session.add(appr)
             session.add(EventLog(event_type="APPROVAL_GRANTED", user_id=user.id, details=str(cmd.id)))
             session.commit()
+            command_executor.submit(cmd.id)
             
             # Notify the command submitter
-            subject = f"Command Approved and Executed (#{appr.id})"
-            text = f"""Your command has been approved and executed:
+            subject = f"Command Approved (#{appr.id})"
+            text = f"""Your command has been approved and queued for execution:
 
 Command: {cmd.command_text}
-Status: EXECUTED
-Result: {cmd.result}
+Status: QUEUED
+Approved by: {user.name}
 New credit balance: {u.credits}"""
-            asyncio.create_task(send_email(u.name, subject, text))
+            background_tasks.add_task(send_email, u.name, subject, text)
             
-            return {"status":"executed", "new_balance": u.credits}
+            return {"status":"queued", "command_id": cmd.id, "new_balance": u.credits}
         elif rejects >= appr.threshold_required:
             appr.resolved = True
             cmd = session.get(Command, appr.command_id)
@@ -243,18 +291,25 @@ New credit balance: {u.credits}"""
 Command: {cmd.command_text}
 Status: REJECTED
 Reason: Approval threshold for rejections reached"""
-            asyncio.create_task(send_email(submitter.name, subject, text))
+            background_tasks.add_task(send_email, submitter.name, subject, text)
             
             return {"status":"rejected"}
         else:
             return {"status":"pending", "approves": approves, "rejects": rejects}
 
+@app.get("/executor/metrics")
+def api_executor_metrics(admin: User = Depends(get_current_user)):
+    """Queue depth, in-flight count and runtime stats for the command executor."""
+    if admin.role != "admin":
+        raise HTTPException(status_code=403, detail="Only admin can view executor metrics")
+    return command_executor.metrics()
+
 @app.get("/approvals/pending")
 def api_get_pending_approvals(worker: User = Depends(get_current_user)):
     """Worker endpoint: fetch all pending approvals for escalation/timeout handling."""
     if worker.role != "admin":
         raise HTTPException(status_code=403, detail="Only admin/worker can access this")
-    with next(get_session()) as session:
+    with next(get_read_session()) as session:
         approvals = session.exec(select(Approval).where(Approval.resolved == False)).all()
         return [
             {
@@ -58,3 +58,9 @@ class EventLog(SQLModel, table=True):
     user_id: Optional[int] = None
     details: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ResourceVersion(SQLModel, table=True):
+    # One row per cached resource (e.g. "rules"); bumped in the writer's transaction
+    name: str = Field(primary_key=True)
+    version: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
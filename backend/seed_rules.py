@@ -9,6 +9,7 @@ import sys
 from sqlmodel import Session, select, create_engine
 from models import Rule, User
 from db import get_engine
+from cache import bump_version
 
 # Rules to seed
 RULES = [
@@ -35,14 +36,14 @@ RULES = [
     },
     {
         "name": "Auto-accept git operations",
-        "pattern": r"git\s+(status|log|diff)",
+        "pattern": r"^git\s+(status|log|diff)\b",
         "action": "AUTO_ACCEPT",
         "priority": 10,
         "threshold": 1,
     },
     {
         "name": "Auto-accept safe read commands",
-        "pattern": r"^(ls|cat|pwd|echo)",
+        "pattern": r"^(ls|cat|pwd|echo)\b",
         "action": "AUTO_ACCEPT",
         "priority": 11,
         "threshold": 1,
@@ -67,6 +68,8 @@ def seed_rules():
             session.add(rule)
             print(f"✅ Added rule: {rule.name}")
         
+        # Invalidate cached GET /rules responses on every backend instance
+        bump_version(session, "rules")
         session.commit()
         print(f"\n🎉 Successfully seeded {len(RULES)} rules!")
 
@@ -26,6 +26,9 @@ export default function CommandForm({client, onSubmit}) {
       } else if (data.status === "REJECTED") {
         type = "error";
         setMsg(`❌ Command rejected: ${data.result || "Auto-rejected by rule"}`);
+      } else if (data.status === "queued") {
+        type = "success";
+        setMsg(`⏳ Command #${data.command_id} queued for execution`);
       } else if (data.status === "PENDING_APPROVAL") {
         type = "info";
         setMsg(`⏳ Command pending approval #${data.approval_id}`);
@@ -8,14 +8,22 @@ export default function Dashboard({apiKey, onLogout}) {
   const [user, setUser] = useState(null);
   const [loading, setLoading] = useState(true);
 
+  const [pendingApprovals, setPendingApprovals] = useState(0);
+  const [statusTotals, setStatusTotals] = useState({});
+
+  // One round trip: profile, latest commands and counts from GET /dashboard
+  const loadDashboard = async () => {
+    const res = await client.get("/dashboard");
+    const data = res.data || {};
+    setUser(data.profile || null);
+    setCommands(data.commands || []);
+    setPendingApprovals(data.pending_approvals || 0);
+    setStatusTotals(data.status_totals || {});
+  };
+
   const refreshData = async () => {
     try {
-      const [cmdsRes, userRes] = await Promise.allSettled([
-        client.get("/commands"),
-        client.get("/users/me")
-      ]);
-      if (cmdsRes.status === "fulfilled") setCommands(cmdsRes.value.data || []);
-      if (userRes.status === "fulfilled") setUser(userRes.value.data || null);
+      await loadDashboard();
     } catch (e) {
       console.error("Failed to refresh:", e);
     }
@@ -29,25 +37,12 @@ export default function Dashboard({apiKey, onLogout}) {
   useEffect(() => {
     const fetchAll = async () => {
       try {
-        const [cmdsRes, userRes] = await Promise.allSettled([
-          client.get("/commands"),
-          client.get("/users/me")
-        ]);
-
-        if (cmdsRes.status === "fulfilled") setCommands(cmdsRes.value.data || []);
-        else {
-          console.error("Failed to load commands:", cmdsRes.reason);
-          setCommands([]);
-        }
-
-        if (userRes.status === "fulfilled") setUser(userRes.value.data || null);
-        else {
-          // No user endpoint or failed; show a friendly empty state instead of loading forever
-          console.warn("Failed to load user info:", userRes.reason);
-          setUser(null);
-        }
+        await loadDashboard();
       } catch (e) {
-        console.error("Unexpected fetch error:", e);
+        // Show a friendly empty state instead of loading forever
+        console.error("Failed to load dashboard:", e);
+        setCommands([]);
+        setUser(null);
       } finally {
         setLoading(false);
       }
@@ -59,7 +54,11 @@ export default function Dashboard({apiKey, onLogout}) {
     const statusMap = {
       "EXECUTED": "success",
       "REJECTED": "error",
+      "FAILED": "error",
+      "TIMEOUT": "error",
       "PENDING_APPROVAL": "warning",
+      "QUEUED": "info",
+      "RUNNING": "info",
       "SUBMITTED": "info"
     };
     return statusMap[status] || "info";
@@ -115,10 +114,14 @@ export default function Dashboard({apiKey, onLogout}) {
                 <div style={{ fontSize: "12px", color: "#666", textTransform: "uppercase", fontWeight: "bold" }}>Role</div>
                 <div style={{ fontSize: "16px", fontWeight: "bold" }}>{user.role}</div>
               </div>
-              <div>
+              <div style={{ marginBottom: "15px" }}>
                 <div style={{ fontSize: "12px", color: "#666", textTransform: "uppercase", fontWeight: "bold" }}>Seniority</div>
                 <div style={{ fontSize: "16px", fontWeight: "bold" }}>{user.seniority}</div>
               </div>
+              <div>
+                <div style={{ fontSize: "12px", color: "#666", textTransform: "uppercase", fontWeight: "bold" }}>Pending Approvals</div>
+                <div style={{ fontSize: "16px", fontWeight: "bold" }}>{pendingApprovals}</div>
+              </div>
             </div>
           ) : (
             <p style={{ color: "#666" }}>Loading user info...</p>
@@ -129,6 +132,15 @@ export default function Dashboard({apiKey, onLogout}) {
       {/* Commands History */}
       <div style={{ backgroundColor: "white", border: "1px solid #ddd", borderRadius: "8px", padding: "20px" }}>
         <h2 style={{ marginTop: 0 }}>📜 Command History</h2>
+        {Object.keys(statusTotals).length > 0 && (
+          <div style={{ display: "flex", flexWrap: "wrap", gap: "8px", marginBottom: "15px" }}>
+            {Object.entries(statusTotals).map(([status, count]) => (
+              <span key={status} style={{ display: "inline-block", padding: "4px 12px", backgroundColor: getStatusColor(getStatusBadge(status)), color: "white", borderRadius: "20px", fontSize: "12px", fontWeight: "bold" }}>
+                {status}: {count}
+              </span>
+            ))}
+          </div>
+        )}
         {loading ? (
           <p style={{ color: "#666", textAlign: "center" }}>Loading commands...</p>
         ) : commands.length === 0 ? (
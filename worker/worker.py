@@ -20,17 +20,11 @@ WORKER_MODE = os.environ.get("WORKER_MODE", "api").lower()
 if WORKER_MODE == "db":
     # Shared DB mode (Render with persistent disk)
     from sqlmodel import Session, select
-    from sqlmodel import SQLModel, create_engine
     from models import Approval, ApprovalVote, Command, User, EventLog
+    from db import create_db_engine
     
-    DB = os.environ.get("DATABASE_URL", "/data/db.sqlite")
-    if DB.startswith("sqlite"):
-        engine = create_engine(DB, connect_args={"check_same_thread": False})
-    elif DB.startswith("postgresql"):
-        db_url = DB.replace("postgresql://", "postgresql+psycopg2://") if "psycopg2" not in DB else DB
-        engine = create_engine(db_url, echo=False, pool_pre_ping=True)
-    else:
-        engine = create_engine(DB, echo=False, pool_pre_ping=True)
+    # Same engine factory as the backend (pool settings + SQLite pragmas)
+    engine = create_db_engine(os.environ.get("DATABASE_URL", "/data/db.sqlite"))
     
     async def check_approvals():
         with Session(engine) as session: